@@ -12,16 +12,29 @@ This module implements the core API functionality of the power consumption manag
 @author: Lenovo
 """
 
+import logging
 import os
-import pandas as pd
+import threading
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from array import array
+from bisect import bisect_left
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from functools import lru_cache
+from itertools import groupby
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import json
 import uvicorn
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from fastapi.responses import JSONResponse
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import AfterValidator, BaseModel
+from typing_extensions import Annotated, TypedDict
+from fastapi.responses import ORJSONResponse
 from loggers import logger
+from storage import ReadingStore
 import csv
 
 # Add response models
@@ -33,14 +46,19 @@ class MeterReadingResponse(BaseModel):
     success: bool
     message: str
 
+class MeterReadingBatchResponse(BaseModel):
+    success: bool
+    message: str
+    recorded_count: int
+
 class ConsumptionResponse(BaseModel):
     meter_id: str
     period: str
     start_reading: float
     end_reading: float
     consumption: float
-    start_time: str
-    end_time: str
+    start_time: datetime
+    end_time: datetime
 
 class BillingDetailsResponse(BaseModel):
     meter_id: str
@@ -48,8 +66,8 @@ class BillingDetailsResponse(BaseModel):
     start_reading: float
     end_reading: float
     consumption: float
-    start_time: str
-    end_time: str
+    start_time: datetime
+    end_time: datetime
     success: bool = True
     message: str = "Bill details retrieved successfully"
 
@@ -58,21 +76,295 @@ class ArchiveResponse(BaseModel):
     message: str
     period: str
 
+# Readings are stored as whole seconds since this (naive) epoch
+EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+
+# Readings are taken on the hour or half hour
+READING_INTERVAL_SECONDS = 1800
+
+DAY_SECONDS = 86400
+WEEK_SECONDS = 7 * DAY_SECONDS
+
+# EPOCH was a Thursday; weeks start on Monday
+MONDAY_OFFSET_SECONDS = 4 * DAY_SECONDS
+
+# Query results are cached per reading interval
+CACHE_BUCKET_SECONDS = READING_INTERVAL_SECONDS
+
+# Readings older than this are dropped from memory after archiving
+RETENTION_DAYS = 90
+
+# Format of new archive files ('csv' or 'parquet'); both formats can be read back
+ARCHIVE_FORMAT = os.getenv("EMS_ARCHIVE_FORMAT", "csv")
+
+# Column types of archive files
+ARCHIVE_COLUMN_TYPES = {"meter_id": pa.string(), "timestamp": pa.timestamp("s"), "reading": pa.float64()}
+ARCHIVE_SCHEMA = pa.schema(list(ARCHIVE_COLUMN_TYPES.items()))
+
+# CSV archives store timestamps as ISO 8601 text
+CSV_ARCHIVE_SCHEMA = ARCHIVE_SCHEMA.set(1, pa.field("timestamp", pa.string()))
+
+# Archive files are written in record batches of about this many rows
+ARCHIVE_BATCH_ROWS = 65536
+
+# Per-meter first and last readings saved alongside monthly archives
+SUMMARY_SCHEMA = pa.schema([
+    ("meter_id", pa.string()),
+    ("start_time", pa.timestamp("s")),
+    ("start_reading", pa.float64()),
+    ("end_time", pa.timestamp("s")),
+    ("end_reading", pa.float64())
+])
+
+def summary_file(archive_file: str) -> str:
+    """Path of the per-meter summary written alongside a monthly archive file"""
+    return os.path.splitext(archive_file)[0] + "_agg.parquet"
+
+def archive_batches(readings: List[Tuple[str, array, array]]) -> Iterator[pa.RecordBatch]:
+    """Pack per-meter (meter_id, timestamps, readings) slices into record batches of about ARCHIVE_BATCH_ROWS rows"""
+    start = rows = 0
+    for end, (_, timestamps, _) in enumerate(readings, 1):
+        rows += len(timestamps)
+        if rows < ARCHIVE_BATCH_ROWS and end < len(readings):
+            continue
+        chunk = readings[start:end]
+        meter_ids = np.array([meter_id for meter_id, _, _ in chunk], dtype=object)
+        yield pa.record_batch([
+            pa.array(np.repeat(meter_ids, [len(ts) for _, ts, _ in chunk]), pa.string()),
+            pa.array(np.concatenate([np.frombuffer(ts, dtype="datetime64[s]") for _, ts, _ in chunk])),
+            pa.array(np.concatenate([np.frombuffer(rd, dtype=np.float64) for _, _, rd in chunk]))
+        ], schema=ARCHIVE_SCHEMA)
+        start, rows = end, 0
+
+def summarise_readings(table: pa.Table) -> pa.Table:
+    """
+    First and last reading of each meter in an archive table
+    
+    A timestamp repeated for a meter keeps its last value.
+    """
+    # The sort is stable, so repeated timestamps stay in file order and all but the last are dropped
+    table = table.sort_by([("meter_id", "ascending"), ("timestamp", "ascending")])
+    if len(table) > 1:
+        meter_ids, timestamps = table.column("meter_id"), table.column("timestamp")
+        repeated = pc.and_(pc.equal(meter_ids[1:], meter_ids[:-1]), pc.equal(timestamps[1:], timestamps[:-1]))
+        table = table.filter(pa.chunked_array(pc.invert(repeated).chunks + [pa.array([True])]))
+    
+    agg = table.group_by("meter_id", use_threads=False).aggregate([
+        ("timestamp", "first"), ("reading", "first"), ("timestamp", "last"), ("reading", "last")
+    ])
+    return pa.table([
+        agg.column("meter_id"),
+        agg.column("timestamp_first").cast(pa.timestamp("s")),
+        agg.column("reading_first"),
+        agg.column("timestamp_last").cast(pa.timestamp("s")),
+        agg.column("reading_last")
+    ], schema=SUMMARY_SCHEMA)
+
+def to_epoch(timestamp: datetime) -> int:
+    """Convert a naive timestamp to whole seconds since EPOCH"""
+    return (timestamp - EPOCH) // ONE_SECOND
+
+def from_epoch(seconds: int) -> datetime:
+    """Convert seconds since EPOCH back to a naive timestamp"""
+    return EPOCH + timedelta(seconds=seconds)
+
+def check_reading_timestamp(timestamp: datetime) -> datetime:
+    """Validate that a reading timestamp is naive local time on the hour or half hour"""
+    if timestamp.tzinfo is not None:
+        raise ValueError("Timestamp must not include a timezone offset")
+    if timestamp.minute % 30 or timestamp.second or timestamp.microsecond:
+        raise ValueError("Timestamp must be on the hour (HH:00:00) or half hour (HH:30:00)")
+    return timestamp
+
+# Reading timestamp checked by pydantic when a request is parsed
+ReadingTimestamp = Annotated[datetime, AfterValidator(check_reading_timestamp)]
+
+# Request models
+class MeterReadingRequest(TypedDict):
+    """One reading in a batch; a TypedDict validates to a plain dict, about twice as fast as a model per reading"""
+    meter_id: str
+    timestamp: ReadingTimestamp
+    reading: float
+
+class MeterReadingBatchRequest(BaseModel):
+    readings: List[MeterReadingRequest]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "readings": [{"meter_id": "123-456-789", "timestamp": "2025-02-08T01:00:00", "reading": 100.5}]
+            }
+        }
+
+def cache_headers() -> Dict[str, str]:
+    """HTTP headers letting clients reuse a query result until the next reading is due"""
+    max_age = CACHE_BUCKET_SECONDS - to_epoch(datetime.now()) % CACHE_BUCKET_SECONDS
+    return {"Cache-Control": f"private, max-age={max_age}"}
+
+def _last_30min_range(now: int) -> Tuple[int, int]:
+    """Most recent completed half hour"""
+    end = now - now % READING_INTERVAL_SECONDS
+    return end - READING_INTERVAL_SECONDS, end
+
+def _today_range(now: int) -> Tuple[int, int]:
+    """Midnight today until now"""
+    return now - now % DAY_SECONDS, now
+
+def _this_week_range(now: int) -> Tuple[int, int]:
+    """Midnight on Monday until now"""
+    return now - (now - MONDAY_OFFSET_SECONDS) % WEEK_SECONDS, now
+
+def _this_month_range(now: int) -> Tuple[int, int]:
+    """Midnight on the 1st until now"""
+    today = from_epoch(now)
+    return to_epoch(datetime(today.year, today.month, 1)), now
+
+# (start, end) range in epoch seconds of each consumption period answered from memory
+PERIOD_RANGES: Dict[str, Callable[[int], Tuple[int, int]]] = {
+    "last_30min": _last_30min_range,
+    "today": _today_range,
+    "this_week": _this_week_range,
+    "this_month": _this_month_range,
+}
+
 class Account:
     """
     Account class for storing meter information and readings
     
+    Readings are kept as two parallel arrays sorted by timestamp, so range
+    queries are answered with a binary search instead of a full scan.
+    
     Attributes:
     - owner_name: Owner name
     - address: Address
     - meter_id: Meter ID
-    - meter_readings: Dictionary storing meter readings, key is timestamp, value is reading
+    - timestamps: Reading timestamps in epoch seconds, ascending
+    - readings: Reading values, parallel to timestamps
+    - version: Counter bumped whenever readings change
     """
     def __init__(self, owner_name: str, address: str, meter_id: str):
         self.owner_name = owner_name
         self.address = address
         self.meter_id = meter_id
-        self.meter_readings: Dict[datetime, float] = {}
+        self.timestamps = array("q")
+        self.readings = array("d")
+        self.version = 0
+    
+    def add_reading(self, timestamp: int, reading: float):
+        """
+        Add a reading, keeping timestamps sorted
+        
+        Parameters:
+        - timestamp: Reading timestamp in epoch seconds
+        - reading: Reading value
+        
+        An existing reading at the same timestamp is overwritten.
+        """
+        self.version += 1
+        timestamps = self.timestamps
+        # Readings normally arrive in order, so appending is the common case
+        if not timestamps or timestamp > timestamps[-1]:
+            timestamps.append(timestamp)
+            self.readings.append(reading)
+            return
+        
+        index = bisect_left(timestamps, timestamp)
+        if timestamps[index] == timestamp:
+            self.readings[index] = reading
+        else:
+            timestamps.insert(index, timestamp)
+            self.readings.insert(index, reading)
+    
+    def add_readings(self, batch: List[Tuple[int, float]]):
+        """
+        Add a batch of (timestamp, reading) pairs sorted by timestamp
+        
+        A batch that starts after the latest reading with no repeated timestamps is
+        appended in one step; any other batch is merged one reading at a time.
+        """
+        if not batch:
+            return
+        if (not self.timestamps or batch[0][0] > self.timestamps[-1]) and all(
+            a[0] < b[0] for a, b in zip(batch, batch[1:])
+        ):
+            self.version += 1
+            self.timestamps.extend(timestamp for timestamp, _ in batch)
+            self.readings.extend(reading for _, reading in batch)
+            return
+        
+        for timestamp, reading in batch:
+            self.add_reading(timestamp, reading)
+    
+    def check_reading(self, timestamp: int, reading: float) -> bool:
+        """
+        Check that a new reading keeps the series non-decreasing
+        
+        Parameters:
+        - timestamp: Reading timestamp in epoch seconds
+        - reading: Reading value
+        
+        Returns:
+        - Whether reading lies between its neighbouring readings
+        """
+        timestamps = self.timestamps
+        if not timestamps:
+            return True
+        # Latest reading is the running maximum for in-order readings
+        if timestamp > timestamps[-1]:
+            return reading >= self.readings[-1]
+        
+        index = bisect_left(timestamps, timestamp)
+        if index > 0 and reading < self.readings[index - 1]:
+            return False
+        next_index = index + 1 if timestamps[index] == timestamp else index
+        return next_index == len(timestamps) or reading <= self.readings[next_index]
+    
+    def find_range(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Get index range of readings with start <= timestamp < end
+        
+        Parameters:
+        - start: Range start in epoch seconds (inclusive)
+        - end: Range end in epoch seconds (exclusive)
+        
+        Returns:
+        - Tuple of (lo, hi) indices into timestamps/readings
+        """
+        return bisect_left(self.timestamps, start), bisect_left(self.timestamps, end)
+    
+    def remove_range(self, lo: int, hi: int):
+        """Remove readings between indices lo (inclusive) and hi (exclusive)"""
+        self.version += 1
+        del self.timestamps[lo:hi]
+        del self.readings[lo:hi]
+    
+    def remove_readings(self, timestamps: array, readings: array):
+        """
+        Remove readings copied out earlier, keeping any added or overwritten since
+        
+        Parameters:
+        - timestamps: Timestamps of the readings to remove, ascending and not empty
+        - readings: Reading values, parallel to timestamps
+        """
+        lo, hi = self.find_range(timestamps[0], timestamps[-1] + 1)
+        # Usually nothing changed in the range, so it is removed with one slice delete
+        if self.timestamps[lo:hi] == timestamps and self.readings[lo:hi] == readings:
+            self.remove_range(lo, hi)
+            return
+        
+        removed = set(zip(timestamps, readings))
+        kept = [pair for pair in zip(self.timestamps[lo:hi], self.readings[lo:hi]) if pair not in removed]
+        self.version += 1
+        self.timestamps[lo:hi] = array("q", (timestamp for timestamp, _ in kept))
+        self.readings[lo:hi] = array("d", (reading for _, reading in kept))
+    
+    def iter_readings(self, lo: int = 0, hi: Optional[int] = None) -> Iterator[Tuple[datetime, float]]:
+        """Iterate (timestamp, reading) pairs between indices lo and hi"""
+        if hi is None:
+            hi = len(self.timestamps)
+        for i in range(lo, hi):
+            yield from_epoch(self.timestamps[i]), self.readings[i]
 
 class APIs:
     """
@@ -81,58 +373,96 @@ class APIs:
     Attributes:
     - accounts: Dictionary storing accounts, key is meter ID, value is Account object
     - is_receiving_data: Whether system is receiving data
+    - store: SQLite store persisting readings that are not yet archived
+    
+    Methods that read or change account readings hold an internal lock, so they can also be
+    called from worker threads (background tasks, asyncio.to_thread).
     """
     def __init__(self):
         self.accounts: Dict[str, Account] = {}
         self.is_receiving_data = True
+        self.store = ReadingStore()
+        self._lock = threading.RLock()
+        self._consumption_cache = lru_cache(maxsize=16384)(self._compute_consumption)
+        self._archive_cache = lru_cache(maxsize=8)(self._load_archive_summary)
+        self._account_fieldnames = ["owner_name", "address", "meter_id"]
+        # Set when account.csv is empty or its header is invalid, so it is rewritten on the next append
+        self._account_header_missing = False
         self._load_accounts()
+        # New accounts are appended through one handle kept open for the process lifetime,
+        # in the column order of the existing header
+        self._account_file = open("account.csv", "a", newline="")
+        self._account_writer = csv.DictWriter(self._account_file, fieldnames=self._account_fieldnames)
+        self._load_readings()
     
     def _load_accounts(self):
         """Load existing accounts from account.csv"""
         if not os.path.exists("account.csv"):
             # Create account.csv with headers if it doesn't exist
             with open("account.csv", "w", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=["owner_name", "address", "meter_id"])
+                writer = csv.DictWriter(f, fieldnames=self._account_fieldnames)
                 writer.writeheader()
             return
         
         try:
-            with open("account.csv", "r") as f:
-                reader = csv.DictReader(f)
-                if not reader.fieldnames or set(reader.fieldnames) != {"owner_name", "address", "meter_id"}:
+            with open("account.csv", "r", newline="") as f:
+                # Plain rows indexed by header position avoid building a dict per account
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if not header or set(header) != {"owner_name", "address", "meter_id"}:
                     logger.error("Invalid CSV headers in account.csv")
+                    self._account_header_missing = True
                     return
+                self._account_fieldnames = header
+                owner_col, address_col, meter_col = (header.index(name) for name in ("owner_name", "address", "meter_id"))
                 
+                accounts = self.accounts
                 for row in reader:
-                    try:
-                        account = Account(
-                            owner_name=row["owner_name"],
-                            address=row["address"],
-                            meter_id=row["meter_id"]
-                        )
-                        self.accounts[account.meter_id] = account
-                    except KeyError as e:
-                        logger.error(f"Missing field in account.csv: {str(e)}")
-                    except Exception as e:
-                        logger.error(f"Error processing account row: {str(e)}")
+                    if len(row) != len(header):
+                        if row:
+                            logger.error("Malformed row in account.csv at line %s", reader.line_num)
+                        continue
+                    meter_id = row[meter_col]
+                    accounts[meter_id] = Account(row[owner_col], row[address_col], meter_id)
         except Exception as e:
-            logger.error(f"Error loading accounts: {str(e)}")
+            logger.error("Error loading accounts: %s", e)
     
-    def _save_accounts(self):
-        """Save accounts to account.csv"""
+    def _load_readings(self):
+        """Load readings persisted in the reading store into memory"""
+        loaded = 0
         try:
-            with open("account.csv", "w", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=["owner_name", "address", "meter_id"])
-                writer.writeheader()
-                for account in self.accounts.values():
-                    writer.writerow({
-                        "owner_name": account.owner_name,
-                        "address": account.address,
-                        "meter_id": account.meter_id
-                    })
-            logger.info("Accounts saved successfully")
+            # Rows come ordered by meter and timestamp, so each meter's readings load in one batch
+            for meter_id, rows in groupby(self.store.iter_readings(), key=lambda row: row[0]):
+                account = self.accounts.get(meter_id)
+                if account is not None:
+                    batch = [(ts, reading) for _, ts, reading in rows]
+                    account.add_readings(batch)
+                    loaded += len(batch)
+            logger.info("Loaded %s readings from %s", loaded, self.store.db_path)
+            # The store keeps readings that were never archived however old they are,
+            # so apply the retention window to what was loaded
+            self.evict_old_readings()
         except Exception as e:
-            logger.error(f"Error saving accounts: {str(e)}")
+            logger.error("Error loading readings: %s", e)
+    
+    def _append_account(self, account: Account):
+        """Append a single account to account.csv"""
+        try:
+            if self._account_header_missing:
+                # No accounts could be loaded from the file, so start it again with a header
+                self._account_file.seek(0)
+                self._account_file.truncate()
+                self._account_writer.writeheader()
+                self._account_header_missing = False
+            self._account_writer.writerow({
+                "owner_name": account.owner_name,
+                "address": account.address,
+                "meter_id": account.meter_id
+            })
+            self._account_file.flush()
+            logger.info("Account saved successfully")
+        except Exception as e:
+            logger.error("Error saving account: %s", e)
             raise
     
     def register_account(self, owner_name: str, address: str, meter_id: str) -> str:
@@ -150,13 +480,14 @@ class APIs:
         Raises:
         - ValueError: If meter ID already exists
         """
-        if meter_id in self.accounts:
-            raise ValueError(f"Meter ID {meter_id} already exists")
-        
-        account = Account(owner_name, address, meter_id)
-        self.accounts[meter_id] = account
-        self._save_accounts()
-        logger.info(f"Account registered successfully: {meter_id}")
+        with self._lock:
+            if meter_id in self.accounts:
+                raise ValueError(f"Meter ID {meter_id} already exists")
+            
+            account = Account(owner_name, address, meter_id)
+            self._append_account(account)
+            self.accounts[meter_id] = account
+        logger.info("Account registered successfully: %s", meter_id)
         
         return meter_id
     
@@ -173,23 +504,101 @@ class APIs:
         - bool: Whether recording was successful
         
         Raises:
-        - ValueError: If meter ID not found or timestamp invalid
+        - ValueError: If meter ID not found or reading lower than a previous reading
+        
+        timestamp must be on the hour or half hour; the API validates it as a ReadingTimestamp.
         """
         if not self.is_receiving_data:
             return False
         
-        if meter_id not in self.accounts:
+        account = self.accounts.get(meter_id)
+        if account is None:
             raise ValueError(f"Meter ID {meter_id} not found")
         
-        # Validate timestamp is on the hour or half hour
-        if timestamp.minute not in [0, 30] or timestamp.second != 0:
-            raise ValueError("Timestamp must be on the hour or half hour")
-        
-        # Record reading
-        self.accounts[meter_id].meter_readings[timestamp] = reading
-        logger.info(f"Meter reading recorded successfully: {meter_id}, {timestamp}, {reading}")
+        epoch = to_epoch(timestamp)
+        with self._lock:
+            # Validate reading does not go backwards
+            if not account.check_reading(epoch, reading):
+                raise ValueError(f"Reading {reading} is inconsistent with existing readings for meter {meter_id}")
+            
+            # Record reading
+            self.store.add_reading(meter_id, epoch, reading)
+            account.add_reading(epoch, reading)
+        logger.info("Meter reading recorded successfully: %s, %s, %s", meter_id, timestamp, reading)
         return True
     
+    def record_meter_readings(self, readings: List[Tuple[str, datetime, float]]) -> int:
+        """
+        Record a batch of meter readings
+        
+        The whole batch is validated before anything is recorded, then persisted in one transaction.
+        
+        Parameters:
+        - readings: List of (meter_id, timestamp, reading) tuples
+        
+        Returns:
+        - int: Number of readings recorded (0 if system is not receiving data)
+        
+        Raises:
+        - ValueError: If any meter ID not found or reading inconsistent
+        
+        Timestamps must be on the hour or half hour; the API validates them as ReadingTimestamp.
+        """
+        if not self.is_receiving_data:
+            return 0
+        
+        # Group readings by meter
+        batches: Dict[str, List[Tuple[int, float]]] = {}
+        for meter_id, timestamp, reading in readings:
+            if meter_id not in self.accounts:
+                raise ValueError(f"Meter ID {meter_id} not found")
+            batches.setdefault(meter_id, []).append((to_epoch(timestamp), reading))
+        
+        with self._lock:
+            # Sort each meter's batch so it merges into the account in order
+            for meter_id, batch in batches.items():
+                batch.sort()
+                account = self.accounts[meter_id]
+                previous = None
+                for epoch, reading in batch:
+                    if (previous is not None and reading < previous) or not account.check_reading(epoch, reading):
+                        raise ValueError(f"Reading {reading} is inconsistent with existing readings for meter {meter_id}")
+                    previous = reading
+            
+            # Record readings
+            rows = [(meter_id, epoch, reading) for meter_id, batch in batches.items() for epoch, reading in batch]
+            self.store.add_readings(rows)
+            for meter_id, batch in batches.items():
+                self.accounts[meter_id].add_readings(batch)
+        if logger.isEnabledFor(logging.INFO):
+            for meter_id, epoch, reading in rows:
+                logger.info("Meter reading recorded successfully: %s, %s, %s", meter_id, from_epoch(epoch), reading)
+        return len(rows)
+    
+    def restore_readings(self, restored: Dict[str, Dict[datetime, float]]) -> Tuple[int, int]:
+        """
+        Load restored readings into memory and the reading store
+        
+        Parameters:
+        - restored: Dictionary of meter ID to {timestamp: reading}
+        
+        Returns:
+        - Tuple of (meters restored, readings restored); meters without an account are skipped
+        """
+        # Sort and convert before taking the lock, which is only held to merge into accounts;
+        # the store has its own lock, so the bulk insert does not hold up callers of self._lock
+        batches = {
+            meter_id: sorted((to_epoch(timestamp), reading) for timestamp, reading in readings.items())
+            for meter_id, readings in restored.items()
+            if meter_id in self.accounts
+        }
+        rows = [(meter_id, epoch, reading) for meter_id, batch in batches.items() for epoch, reading in batch]
+        with self._lock:
+            for meter_id, batch in batches.items():
+                self.accounts[meter_id].add_readings(batch)
+        self.store.add_readings(rows)
+        return len(batches), len(rows)
+    
     def get_consumption(self, meter_id: str, period: str) -> Dict:
         """
         Get power consumption for specified period
@@ -208,10 +617,22 @@ class APIs:
         
         Raises:
         - ValueError: If meter ID not found, invalid period, or insufficient data
+        
+        Results are cached per half-hour bucket and recomputed once the meter's readings change.
         """
-        if meter_id not in self.accounts:
+        account = self.accounts.get(meter_id)
+        if account is None:
             raise ValueError(f"Meter ID {meter_id} not found")
         
+        bucket = to_epoch(datetime.now()) // CACHE_BUCKET_SECONDS
+        return dict(self._consumption_cache(meter_id, period, bucket, account.version))
+    
+    def _compute_consumption(self, meter_id: str, period: str, bucket: int, version: int) -> Dict:
+        """
+        Compute power consumption for get_consumption
+        
+        bucket and version are not used in the calculation; they only key the cache.
+        """
         now = datetime.now()
         
         # Special handling for last_month - read from archive
@@ -224,87 +645,60 @@ class APIs:
                 year = now.year
                 month = now.month - 1
             
-            # Get archive file path
-            archive_file = os.path.join("Archive", f"monthly_{year:04d}-{month:02d}.csv")
-            
-            if not os.path.exists(archive_file):
-                raise FileNotFoundError(f"Archive file not found: monthly_{year:04d}-{month:02d}.csv")
-            
             # Read archive file
-            readings = {}
-            with open(archive_file, "r") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row["meter_id"] == meter_id:  # Only process rows for this meter
-                        timestamp = datetime.fromisoformat(row["timestamp"])
-                        reading = float(row["reading"])
-                        readings[timestamp] = reading
+            archive_file = self._find_archive_file(f"monthly_{year:04d}-{month:02d}")
+            summary = self._get_archive_summary(archive_file, meter_id)
             
-            if not readings:
+            if summary is None:
                 raise ValueError(f"No readings found for meter {meter_id} in last month's archive")
             
             # Get first and last readings
-            sorted_times = sorted(readings.keys())
-            start_reading = readings[sorted_times[0]]
-            end_reading = readings[sorted_times[-1]]
+            start_time, start_reading, end_time, end_reading = summary
             
             return {
                 "start_reading": start_reading,
                 "end_reading": end_reading,
                 "consumption": end_reading - start_reading,
-                "start_time": sorted_times[0].isoformat(),
-                "end_time": sorted_times[-1].isoformat()
+                "start_time": start_time,
+                "end_time": end_time
             }
         
         # For other periods, use existing logic
-        readings = self.accounts[meter_id].meter_readings
-        if not readings:
+        account = self.accounts[meter_id]
+        if not account.timestamps:
             raise ValueError("No readings found for this meter")
         
         # Calculate time range based on period
-        if period == "last_30min":
-            end_time = now.replace(minute=30 if now.minute >= 30 else 0, second=0, microsecond=0)
-            if now.minute >= 30:
-                end_time = end_time.replace(hour=now.hour)
-            else:
-                end_time = end_time.replace(hour=now.hour-1 if now.hour > 0 else 23)
-            start_time = end_time - timedelta(minutes=30)
-        
-        elif period == "today":
-            start_time = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_time = now
-        
-        elif period == "this_week":
-            start_time = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
-            end_time = now
-        
-        elif period == "this_month":
-            start_time = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_time = now
-        
-        else:
+        period_range = PERIOD_RANGES.get(period)
+        if period_range is None:
             raise ValueError("Invalid period")
+        start, end = period_range(to_epoch(now))
         
-        # Filter readings within time range
-        period_readings = {ts: reading for ts, reading in readings.items() if start_time <= ts <= end_time}
-        
-        if not period_readings:
-            raise ValueError(f"No readings found for period {period}")
-        
-        if len(period_readings) < 2:
-            raise ValueError(f"Insufficient readings for period {period}")
-        
-        # Get first and last readings
-        sorted_times = sorted(period_readings.keys())
-        start_reading = period_readings[sorted_times[0]]
-        end_reading = period_readings[sorted_times[-1]]
+        with self._lock:
+            timestamps = account.timestamps
+            if period == "last_30min" and len(timestamps) >= 2 and timestamps[-2] == start and timestamps[-1] == end:
+                # Usual case: the two latest readings bound the last half hour
+                lo, hi = len(timestamps) - 2, len(timestamps)
+            else:
+                # Locate readings within time range (end inclusive)
+                lo, hi = account.find_range(start, end + 1)
+            
+            if hi == lo:
+                raise ValueError(f"No readings found for period {period}")
+            
+            if hi - lo < 2:
+                raise ValueError(f"Insufficient readings for period {period}")
+            
+            # Get first and last readings
+            start_reading, start_ts = account.readings[lo], account.timestamps[lo]
+            end_reading, end_ts = account.readings[hi - 1], account.timestamps[hi - 1]
         
         return {
             "start_reading": start_reading,
             "end_reading": end_reading,
             "consumption": end_reading - start_reading,
-            "start_time": sorted_times[0].isoformat(),
-            "end_time": sorted_times[-1].isoformat()
+            "start_time": from_epoch(start_ts),
+            "end_time": from_epoch(end_ts)
         }
     
     def get_last_month_bill(self, meter_id: str) -> Optional[Dict]:
@@ -337,42 +731,79 @@ class APIs:
             year = now.year
             month = now.month - 1
         
-        archive_file = os.path.join("Archive", f"monthly_{year:04d}-{month:02d}.csv")
-        
-        if not os.path.exists(archive_file):
-            raise FileNotFoundError(f"Archive file not found: monthly_{year:04d}-{month:02d}.csv")
+        archive_file = self._find_archive_file(f"monthly_{year:04d}-{month:02d}")
         
         # Read archive file
-        readings = {}
         try:
-            with open(archive_file, "r") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row["meter_id"] == meter_id:  # Only process rows for this meter
-                        timestamp = datetime.fromisoformat(row["timestamp"])
-                        reading = float(row["reading"])
-                        readings[timestamp] = reading
+            summary = self._get_archive_summary(archive_file, meter_id)
             
-            if not readings:
-                raise ValueError(f"No readings found for meter {meter_id} in monthly_{year:04d}-{month:02d}.csv")
+            if summary is None:
+                raise ValueError(f"No readings found for meter {meter_id} in {os.path.basename(archive_file)}")
             
             # Get first and last readings
-            sorted_times = sorted(readings.keys())
-            start_reading = readings[sorted_times[0]]
-            end_reading = readings[sorted_times[-1]]
+            start_time, start_reading, end_time, end_reading = summary
             
             return {
                 "period": f"{year:04d}-{month:02d}",
                 "start_reading": start_reading,
                 "end_reading": end_reading,
                 "consumption": end_reading - start_reading,
-                "start_time": sorted_times[0].isoformat(),
-                "end_time": sorted_times[-1].isoformat()
+                "start_time": start_time,
+                "end_time": end_time
             }
         except Exception as e:
-            logger.error(f"Error reading archive file: {str(e)}")
+            logger.error("Error reading archive file: %s", e)
             raise
     
+    def _find_archive_file(self, name: str) -> str:
+        """
+        Find archive file by name without extension, preferring Parquet over CSV
+        
+        Raises:
+        - FileNotFoundError: If neither file exists
+        """
+        for extension in ("parquet", "csv"):
+            archive_file = os.path.join("Archive", f"{name}.{extension}")
+            if os.path.exists(archive_file):
+                return archive_file
+        raise FileNotFoundError(f"Archive file not found: {name}.csv")
+    
+    def _get_archive_summary(self, archive_file: str, meter_id: str) -> Optional[Tuple[datetime, float, datetime, float]]:
+        """
+        Get a meter's first and last readings in an archive file
+        
+        Each archive file is parsed once and cached until its modification time changes.
+        
+        Returns:
+        - Tuple of (start_time, start_reading, end_time, end_reading), or None if the meter has no readings
+        """
+        return self._archive_cache(archive_file, os.path.getmtime(archive_file)).get(meter_id)
+    
+    def _load_archive_summary(self, archive_file: str, mtime: float) -> Dict[str, Tuple[datetime, float, datetime, float]]:
+        """
+        Parse an archive file into first and last readings per meter for _get_archive_summary
+        
+        mtime is not used in the calculation; it only keys the cache.
+        """
+        # Use the summary written at archive time unless the archive has changed since
+        agg_file = summary_file(archive_file)
+        if os.path.exists(agg_file) and os.path.getmtime(agg_file) >= mtime:
+            agg = pq.read_table(agg_file, columns=SUMMARY_SCHEMA.names).cast(SUMMARY_SCHEMA)
+        else:
+            if archive_file.endswith(".parquet"):
+                table = pq.read_table(archive_file, columns=list(ARCHIVE_COLUMN_TYPES))
+            else:
+                # Arrow parses the CSV straight into typed columns
+                table = pacsv.read_csv(archive_file, convert_options=pacsv.ConvertOptions(
+                    column_types=ARCHIVE_COLUMN_TYPES,
+                    include_columns=list(ARCHIVE_COLUMN_TYPES)
+                ))
+            agg = summarise_readings(table)
+            logger.info("Loaded archive summary for %s meter(s) from %s", len(agg), archive_file)
+        
+        meter_ids, *columns = (agg.column(name).to_pylist() for name in SUMMARY_SCHEMA.names)
+        return dict(zip(meter_ids, zip(*columns)))
+    
     def shutdown_system(self):
         """Stop system data reception"""
         self.is_receiving_data = False
@@ -383,88 +814,224 @@ class APIs:
         self.is_receiving_data = True
         logger.info("System data reception resumed")
 
-    def archive_readings(self, period: str, clear_memory: bool = False) -> bool:
+    def snapshot_readings(self, period: str) -> Tuple[str, List[Tuple[str, array, array]]]:
         """
-        Archive meter readings for specified period
+        Collect meter readings to archive for specified period
+        
+        Only copies readings out of memory; writing the archive file is left to write_archive,
+        and removing the archived readings to clear_archived once the archive is written.
         
         Parameters:
         - period: Archive period ('daily' or 'monthly')
-        - clear_memory: Whether to clear archived data from memory
         
         Returns:
-        - Whether archiving was successful
+        - Tuple of (archive file path, per-meter (meter_id, timestamps, readings) slices)
+        
+        Raises:
+        - ValueError: If period is invalid
         """
-        try:
-            now = datetime.now()
-            archive_dir = os.path.join("Archive")
-            os.makedirs(archive_dir, exist_ok=True)
-            
-            # Calculate time range based on period
-            if period == "daily":
-                yesterday = (now - timedelta(days=1)).date()
-                start_time = datetime.combine(yesterday, datetime.min.time())
-                end_time = start_time + timedelta(days=1)
-                archive_file = os.path.join(archive_dir, f"daily_{yesterday.isoformat()}.csv")
-            elif period == "monthly":
-                first_day_this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                end_time = first_day_this_month
-                start_time = (end_time - timedelta(days=1)).replace(day=1)
-                archive_file = os.path.join(archive_dir, f"monthly_{start_time.year:04d}-{start_time.month:02d}.csv")
-            else:
-                raise ValueError(f"Invalid period: {period}")
-            
-            # Archive readings for each meter
-            all_readings = []
+        now = datetime.now()
+        archive_dir = os.path.join("Archive")
+        extension = "parquet" if ARCHIVE_FORMAT == "parquet" else "csv"
+        
+        # Calculate time range based on period
+        if period == "daily":
+            yesterday = (now - timedelta(days=1)).date()
+            start_time = datetime.combine(yesterday, datetime.min.time())
+            end_time = start_time + timedelta(days=1)
+            archive_file = os.path.join(archive_dir, f"daily_{yesterday.isoformat()}.{extension}")
+        elif period == "monthly":
+            end_time = datetime(now.year, now.month, 1)
+            start_time = datetime(now.year - 1, 12, 1) if now.month == 1 else datetime(now.year, now.month - 1, 1)
+            archive_file = os.path.join(archive_dir, f"monthly_{start_time.year:04d}-{start_time.month:02d}.{extension}")
+        else:
+            raise ValueError(f"Invalid period: {period}")
+        
+        # Collect readings for each meter
+        start_epoch = to_epoch(start_time)
+        end_epoch = to_epoch(end_time)
+        readings = []
+        with self._lock:
             for meter_id, account in self.accounts.items():
                 # Get readings for the period
-                period_readings = {
-                    ts: reading 
-                    for ts, reading in account.meter_readings.items() 
-                    if start_time <= ts < end_time
-                }
+                lo, hi = account.find_range(start_epoch, end_epoch)
                 
-                if period_readings:
-                    # Add to collection
-                    for ts, reading in period_readings.items():
-                        all_readings.append({
-                            "meter_id": meter_id,
-                            "timestamp": ts.isoformat(),
-                            "reading": reading
-                        })
-                    
-                    # Clear from memory if requested
-                    if clear_memory:
-                        for ts in period_readings.keys():
-                            del account.meter_readings[ts]
+                if hi > lo:
+                    # Slicing copies the arrays, so the snapshot is unaffected by later changes
+                    readings.append((meter_id, account.timestamps[lo:hi], account.readings[lo:hi]))
+        
+        return archive_file, readings
+    
+    def write_archive(self, period: str, archive_file: str, readings: List[Tuple[str, array, array]]) -> bool:
+        """
+        Write readings collected by snapshot_readings to archive file
+        
+        Parameters:
+        - period: Archive period ('daily' or 'monthly')
+        - archive_file: Archive file path
+        - readings: Per-meter (meter_id, timestamps, readings) slices
+        
+        Returns:
+        - Whether writing was successful
+        
+        Rows are streamed to the file in record batches, so only one batch is converted at a time.
+        """
+        try:
+            os.makedirs(os.path.dirname(archive_file), exist_ok=True)
             
-            # Save to CSV if we have readings
-            if all_readings:
-                with open(archive_file, "w", newline="") as f:
-                    writer = csv.DictWriter(f, fieldnames=["meter_id", "timestamp", "reading"])
-                    writer.writeheader()
-                    writer.writerows(all_readings)
+            # Save if we have readings
+            if readings:
+                if archive_file.endswith(".parquet"):
+                    # Columns are written as typed binary, without formatting any values; meter IDs
+                    # repeat so they are dictionary encoded, and evenly spaced timestamps delta encoded
+                    with pq.ParquetWriter(
+                        archive_file, ARCHIVE_SCHEMA, compression="zstd",
+                        use_dictionary=["meter_id"], column_encoding={"timestamp": "DELTA_BINARY_PACKED"}
+                    ) as writer:
+                        for batch in archive_batches(readings):
+                            writer.write_batch(batch)
+                else:
+                    # Arrow formats the timestamps and writes the CSV in C++
+                    with pacsv.CSVWriter(archive_file, CSV_ARCHIVE_SCHEMA) as writer:
+                        for batch in archive_batches(readings):
+                            writer.write_batch(pa.record_batch([
+                                batch.column(0),
+                                pc.strftime(batch.column(1), format="%Y-%m-%dT%H:%M:%S"),
+                                batch.column(2)
+                            ], schema=CSV_ARCHIVE_SCHEMA))
+                
+                # Monthly archives are queried for bills, so save each meter's first and last reading
+                # next to them; slices are per meter and already in time order
+                if period == "monthly":
+                    pq.write_table(pa.table([
+                        [meter_id for meter_id, _, _ in readings],
+                        [ts[0] for _, ts, _ in readings],
+                        [rd[0] for _, _, rd in readings],
+                        [ts[-1] for _, ts, _ in readings],
+                        [rd[-1] for _, _, rd in readings]
+                    ], schema=SUMMARY_SCHEMA), summary_file(archive_file))
             
-            logger.info(f"Successfully archived {period} readings")
+            # last_month results are read from archive files
+            self._consumption_cache.cache_clear()
+            logger.info("Successfully archived %s readings", period)
             return True
             
         except Exception as e:
-            logger.error(f"Error during {period} archiving: {str(e)}")
+            logger.error("Error during %s archiving: %s", period, e)
             return False
+    
+    def archive_readings(self, period: str, clear_memory: bool = False) -> bool:
+        """
+        Archive meter readings for specified period
+        
+        Parameters:
+        - period: Archive period ('daily' or 'monthly')
+        - clear_memory: Whether to clear archived data from memory
+        
+        Returns:
+        - Whether archiving was successful
+        """
+        try:
+            archive_file, readings = self.snapshot_readings(period)
+        except Exception as e:
+            logger.error("Error during %s archiving: %s", period, e)
+            return False
+        
+        return self.complete_archive(period, archive_file, readings, clear_memory)
+    
+    def complete_archive(self, period: str, archive_file: str, readings: List[Tuple[str, array, array]],
+                         clear_memory: bool = False) -> bool:
+        """
+        Write a snapshot taken by snapshot_readings, then clear and evict old readings
+        
+        Parameters:
+        - period: Archive period ('daily' or 'monthly')
+        - archive_file: Archive file path
+        - readings: Per-meter (meter_id, timestamps, readings) slices
+        - clear_memory: Whether to clear archived data from memory
+        
+        Returns:
+        - Whether archiving was successful
+        """
+        success = self.write_archive(period, archive_file, readings)
+        if success:
+            # Archived readings are only cleared once they are safely on disk
+            if clear_memory:
+                self.clear_archived(readings)
+            self.evict_old_readings()
+        return success
+    
+    def clear_archived(self, readings: List[Tuple[str, array, array]]):
+        """
+        Remove archived readings from memory and the reading store
+        
+        Only the snapshotted readings are removed; readings recorded or overwritten in
+        the same period while the archive was being written are kept.
+        
+        Parameters:
+        - readings: Per-meter (meter_id, timestamps, readings) slices from snapshot_readings
+        """
+        with self._lock:
+            for meter_id, timestamps, values in readings:
+                account = self.accounts.get(meter_id)
+                if account is not None:
+                    account.remove_readings(timestamps, values)
+        
+        # The store has its own lock, so the bulk delete does not hold up callers of self._lock
+        self.store.delete_readings(
+            (meter_id, timestamp, reading)
+            for meter_id, timestamps, values in readings
+            for timestamp, reading in zip(timestamps, values)
+        )
+    
+    def evict_old_readings(self, retention_days: int = RETENTION_DAYS) -> int:
+        """
+        Drop readings older than the retention window from memory
+        
+        The reading store is left untouched: readings are only deleted from it by clear_archived,
+        once they have been archived.
+        
+        Parameters:
+        - retention_days: Number of days of readings to keep
+        
+        Returns:
+        - Number of readings removed from memory
+        """
+        cutoff = to_epoch(datetime.now() - timedelta(days=retention_days))
+        removed = 0
+        with self._lock:
+            for account in self.accounts.values():
+                hi = bisect_left(account.timestamps, cutoff)
+                if hi:
+                    account.remove_range(0, hi)
+                    removed += hi
+        if removed:
+            logger.info("Evicted %s readings older than %s days", removed, retention_days)
+        return removed
 
 # Create FastAPI application
-app = FastAPI(title="Power Consumption Management API System")
-ems = APIs()
+app = FastAPI(title="Power Consumption Management API System", default_response_class=ORJSONResponse)
+
+# Created when this app starts rather than on import, so modules importing helpers from here
+# (app.py, restore.py, daily.py, monthly.py) do not load readings.db and account.csv
+ems: Optional[APIs] = None
+
+@app.on_event("startup")
+def create_ems():
+    """Create the EMS instance serving this app"""
+    global ems
+    ems = APIs()
 
 @app.post("/register_account", response_model=AccountResponse)
 async def register_account(owner_name: str, region: str, meter_id: str):
     try:
-        meter_id = ems.register_account(owner_name, region, meter_id)
+        meter_id = await run_in_threadpool(ems.register_account, owner_name, region, meter_id)
         return AccountResponse(meter_id=meter_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/receive_meter_reading", response_model=MeterReadingResponse)
-async def receive_meter_reading(meter_id: str, timestamp: datetime, reading: float):
+@app.post("/receive_meter_reading", responses={200: {"model": MeterReadingResponse}})
+async def receive_meter_reading(meter_id: str, timestamp: ReadingTimestamp, reading: float):
     """
     Receive Meter Reading
     
@@ -480,19 +1047,53 @@ async def receive_meter_reading(meter_id: str, timestamp: datetime, reading: flo
     """
     try:
         success = ems.record_meter_reading(meter_id, timestamp, reading)
-        return MeterReadingResponse(
-            success=success,
-            message="Reading recorded successfully"
+        return ORJSONResponse({
+            "success": success,
+            "message": "Reading recorded successfully"
+        })
+    except ValueError as e:
+        error_msg = str(e)
+        logger.error("Failed to record meter reading: %s", error_msg)
+        raise HTTPException(
+            status_code=400,
+            detail=error_msg
+        )
+
+@app.post("/receive_meter_readings_bulk", responses={200: {"model": MeterReadingBatchResponse}})
+async def receive_meter_readings_bulk(batch: MeterReadingBatchRequest):
+    """
+    Receive a batch of meter readings
+    
+    Parameters:
+    - readings: List of meter readings, each with meter_id, timestamp and reading
+    
+    The batch is rejected as a whole if any reading is invalid.
+    
+    Example:
+    ```
+    {"readings": [{"meter_id": "123-456-789", "timestamp": "2025-02-08T01:00:00", "reading": 100.5}]}
+    ```
+    """
+    try:
+        # Large batches are sorted, validated, persisted and logged off the event loop
+        recorded = await run_in_threadpool(
+            ems.record_meter_readings,
+            [(item["meter_id"], item["timestamp"], item["reading"]) for item in batch.readings]
         )
+        return ORJSONResponse({
+            "success": ems.is_receiving_data,
+            "message": "Readings recorded successfully",
+            "recorded_count": recorded
+        })
     except ValueError as e:
         error_msg = str(e)
-        logger.error(f"Failed to record meter reading: {error_msg}")
+        logger.error("Failed to record meter readings: %s", error_msg)
         raise HTTPException(
             status_code=400,
             detail=error_msg
         )
 
-@app.get("/get_consumption", response_model=ConsumptionResponse)
+@app.get("/get_consumption", responses={200: {"model": ConsumptionResponse}})
 async def get_consumption(meter_id: str, period: str):
     """
     Query power consumption for specified period
@@ -507,18 +1108,22 @@ async def get_consumption(meter_id: str, period: str):
     ```
     """
     try:
-        consumption = ems.get_consumption(meter_id, period)
+        if period == "last_month":
+            # May parse last month's archive file
+            consumption = await run_in_threadpool(ems.get_consumption, meter_id, period)
+        else:
+            consumption = ems.get_consumption(meter_id, period)
         if consumption is None:
             raise HTTPException(status_code=404, detail="Meter not found or invalid period")
-        return ConsumptionResponse(
-            meter_id=meter_id,
-            period=period,
+        return ORJSONResponse({
+            "meter_id": meter_id,
+            "period": period,
             **consumption
-        )
+        }, headers=cache_headers())
     except (ValueError, FileNotFoundError) as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/get_last_month_bill", response_model=BillingDetailsResponse)
+@app.get("/get_last_month_bill", responses={200: {"model": BillingDetailsResponse}})
 async def get_last_month_bill(meter_id: str):
     """
     Get last month's bill details
@@ -540,23 +1145,29 @@ async def get_last_month_bill(meter_id: str):
     ```
     """
     try:
-        bill_details = ems.get_last_month_bill(meter_id)
+        bill_details = await run_in_threadpool(ems.get_last_month_bill, meter_id)
         if bill_details is None:
             raise HTTPException(status_code=404, detail="Meter not found")
-        return {
+        return ORJSONResponse({
             "meter_id": meter_id,
-            **bill_details
-        }
+            **bill_details,
+            "success": True,
+            "message": "Bill details retrieved successfully"
+        }, headers=cache_headers())
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/archive_and_prepare", response_model=ArchiveResponse)
-async def archive_and_prepare(period: str):
+@app.post("/archive_and_prepare", responses={200: {"model": ArchiveResponse}, 202: {"model": ArchiveResponse}}, status_code=202)
+async def archive_and_prepare(period: str, background_tasks: BackgroundTasks):
     """
     Archive readings for specified period
     
+    Readings are collected immediately; the archive file is written in the background
+    after the response is sent. Responds 200 without writing a file if the period has
+    no readings.
+    
     Parameters:
     - period: Archive period ('daily' or 'monthly')
     
@@ -568,9 +1179,29 @@ async def archive_and_prepare(period: str):
     if period not in ['daily', 'monthly']:
         raise HTTPException(status_code=400, detail="Invalid period. Must be 'daily' or 'monthly'")
     
-    success = ems.archive_readings(period)
-    return ArchiveResponse(
-        success=success,
-        message=f"Successfully archived {period} readings" if success else "Failed to archive readings",
-        period=period
+    archive_file, readings = ems.snapshot_readings(period)
+    if not readings:
+        return ORJSONResponse({
+            "success": True,
+            "message": f"No {period} readings to archive",
+            "period": period
+        })
+    
+    background_tasks.add_task(ems.complete_archive, period, archive_file, readings)
+    return ORJSONResponse({
+        "success": True,
+        "message": f"Archiving {period} readings to {archive_file}",
+        "period": period
+    }, status_code=202)
+
+if __name__ == "__main__":
+    # Accounts and readings live in process memory, so keep one worker unless
+    # EMS_WORKERS is raised explicitly; uvloop/httptools are used when installed
+    uvicorn.run(
+        "APIs:app",
+        host=os.getenv("EMS_HOST", "localhost"),
+        port=int(os.getenv("EMS_PORT", "8000")),
+        workers=int(os.getenv("EMS_WORKERS", "1")),
+        loop="auto",
+        http="auto"
     )
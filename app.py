@@ -1,25 +1,30 @@
 import os
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, validator
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
 import uvicorn
 from datetime import datetime
 import asyncio
 from typing import Optional
 from enum import Enum
 from restore import DataRestorer
-from APIs import APIs  # Import the APIs class directly
+from APIs import APIs, MeterReadingBatchRequest, ReadingTimestamp, cache_headers  # Import the APIs class directly
 from loggers import logger
 
 # Create FastAPI application
-app = FastAPI(title="Power Consumption Management System")
+app = FastAPI(title="Power Consumption Management System", default_response_class=ORJSONResponse)
 
-# Create API instance
-api_system = APIs()  # Use the correct class name
+# API instance, created at startup rather than on import: uvicorn imports this module again
+# as "app", so creating it here would load a second copy when run as a script
+api_system: Optional[APIs] = None
 
-# Startup event only logs system start
+# Startup event creates the API instance and logs system start
 @app.on_event("startup")
 async def startup_event():
-    """Log system startup"""
+    """Create the API instance and log system startup"""
+    global api_system
+    api_system = APIs()
     try:
         logger.info("Starting application...")
     except Exception as e:
@@ -39,28 +44,6 @@ class SystemState:
 
 system_state = SystemState()
 
-# Request Models
-class MeterReadingRequest(BaseModel):
-    meter_id: str
-    timestamp: datetime
-    reading: float
-
-    @validator('timestamp')
-    def validate_timestamp(cls, v):
-        # Validate if the timestamp is on the hour or half hour
-        if v.minute not in [0, 30] or v.second != 0:
-            raise ValueError("Timestamp must be on the hour (HH:00:00) or half hour (HH:30:00)")
-        return v
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "meter_id": "123-456-789",
-                "timestamp": "2025-02-08T01:00:00",
-                "reading": 100.5
-            }
-        }
-
 # Response Models
 class MaintenanceResponse(BaseModel):
     success: bool
@@ -87,8 +70,8 @@ class BillingDetailsResponse(BaseModel):
     start_reading: float
     end_reading: float
     consumption: float
-    start_time: str
-    end_time: str
+    start_time: datetime
+    end_time: datetime
     success: bool = True
     message: str = "Bill details retrieved successfully"
 
@@ -105,8 +88,8 @@ class ConsumptionResponse(BaseModel):
     start_reading: float
     end_reading: float
     consumption: float
-    start_time: str
-    end_time: str
+    start_time: datetime
+    end_time: datetime
 
 # API endpoints
 @app.post("/register_account")
@@ -129,7 +112,7 @@ async def register_account(owner_name: str, address: str, meter_id: str):
         logger.warning("Registration failed due to maintenance mode")
         raise HTTPException(status_code=503, detail="System is in maintenance mode")
     try:
-        meter_id = api_system.register_account(owner_name, address, meter_id)
+        meter_id = await run_in_threadpool(api_system.register_account, owner_name, address, meter_id)
         logger.info(f"Account registered successfully: {meter_id}")
         return {"meter_id": meter_id, "message": "Account successfully created"}
     except ValueError as e:
@@ -137,7 +120,7 @@ async def register_account(owner_name: str, address: str, meter_id: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/receive_meter_reading")
-async def receive_meter_reading(meter_id: str, timestamp: datetime, reading: float):
+async def receive_meter_reading(meter_id: str, timestamp: ReadingTimestamp, reading: float):
     """
     Receive meter reading
     
@@ -156,15 +139,48 @@ async def receive_meter_reading(meter_id: str, timestamp: datetime, reading: flo
     try:
         success = api_system.record_meter_reading(meter_id, timestamp, reading)
         logger.info(f"Meter reading successfully recorded for meter ID: {meter_id}")
-        return {
+        return ORJSONResponse({
             "success": success,
             "message": "Reading recorded successfully" if success else "Failed to record reading"
-        }
+        })
     except ValueError as e:
         logger.error(f"Failed to record meter reading: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/get_consumption", response_model=ConsumptionResponse)
+@app.post("/receive_meter_readings_bulk")
+async def receive_meter_readings_bulk(batch: MeterReadingBatchRequest):
+    """
+    Receive a batch of meter readings
+    
+    Parameters:
+    - readings: List of meter readings, each with meter_id, timestamp and reading
+    
+    The batch is rejected as a whole if any reading is invalid.
+    
+    Example:
+    ```
+    {"readings": [{"meter_id": "123-456-789", "timestamp": "2025-02-08T01:00:00", "reading": 100.5}]}
+    ```
+    """
+    logger.info(f"Received bulk meter reading request with {len(batch.readings)} readings")
+
+    try:
+        # Large batches are sorted, validated, persisted and logged off the event loop
+        recorded = await run_in_threadpool(
+            api_system.record_meter_readings,
+            [(item["meter_id"], item["timestamp"], item["reading"]) for item in batch.readings]
+        )
+        logger.info(f"Bulk meter readings recorded: {recorded}")
+        return ORJSONResponse({
+            "success": api_system.is_receiving_data,
+            "message": "Readings recorded successfully" if api_system.is_receiving_data else "Failed to record readings",
+            "recorded_count": recorded
+        })
+    except ValueError as e:
+        logger.error(f"Failed to record bulk meter readings: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/get_consumption", responses={200: {"model": ConsumptionResponse}})
 async def get_consumption(meter_id: str, period: str):
     """
     Query power consumption
@@ -194,13 +210,17 @@ async def get_consumption(meter_id: str, period: str):
     logger.info(f"Received request to get consumption for meter ID: {meter_id}, period: {period}")
 
     try:
-        consumption_data = api_system.get_consumption(meter_id, period)
+        if period == "last_month":
+            # May parse last month's archive file
+            consumption_data = await run_in_threadpool(api_system.get_consumption, meter_id, period)
+        else:
+            consumption_data = api_system.get_consumption(meter_id, period)
         logger.info(f"Consumption retrieved successfully for meter ID: {meter_id}, period: {period}")
-        return ConsumptionResponse(
-            meter_id=meter_id,
-            period=period,
+        return ORJSONResponse({
+            "meter_id": meter_id,
+            "period": period,
             **consumption_data
-        )
+        }, headers=cache_headers())
     except ValueError as e:
         error_msg = str(e)
         logger.error(f"Error getting consumption: {error_msg}")
@@ -228,7 +248,7 @@ async def get_consumption(meter_id: str, period: str):
 # Maintenance related functions
 async def perform_daily_maintenance():
     """Perform daily maintenance tasks"""
-    success = api_system.archive_readings("daily", clear_memory=False)  # Daily maintenance doesn't clear memory
+    success = await run_in_threadpool(api_system.archive_readings, "daily", clear_memory=False)  # Daily maintenance doesn't clear memory
     return MaintenanceResponse(
         success=success,
         message="Daily maintenance completed" if success else "Daily maintenance failed",
@@ -239,20 +259,8 @@ async def perform_daily_maintenance():
 async def perform_monthly_maintenance():
     """Perform monthly maintenance tasks"""
     try:
-        # First get last month's data for all meters before archiving
-        meter_data = {}
-        for meter_id in api_system.accounts.keys():
-            try:
-                meter_data[meter_id] = {
-                    'current_month': api_system.get_consumption(meter_id, "this_month"),
-                    'last_month': api_system.get_consumption(meter_id, "last_month")
-                }
-            except ValueError:
-                # Skip if no data available for this meter
-                continue
-        
-        # Perform archiving
-        archive_success = api_system.archive_readings("monthly", clear_memory=True)
+        # Archive all meters in one pass; bills are then served from the archive's per-meter summary
+        archive_success = await run_in_threadpool(api_system.archive_readings, "monthly", clear_memory=True)
         
         if not archive_success:
             raise Exception("Monthly archiving failed")
@@ -382,7 +390,7 @@ async def resume():
         is_receiving_data=True
     )
 
-@app.get("/get_last_month_bill", response_model=BillingDetailsResponse)
+@app.get("/get_last_month_bill", responses={200: {"model": BillingDetailsResponse}})
 async def get_last_month_bill(meter_id: str):
     """
     Get last month's bill details
@@ -406,18 +414,20 @@ async def get_last_month_bill(meter_id: str):
     logger.info(f"Received request to get last month's bill for meter ID: {meter_id}")
     
     try:
-        bill_details = api_system.get_last_month_bill(meter_id)
+        bill_details = await run_in_threadpool(api_system.get_last_month_bill, meter_id)
         if bill_details is None:
             logger.error(f"Meter ID {meter_id} not found")
             raise HTTPException(status_code=404, detail="Meter not found")
             
         response = {
             "meter_id": meter_id,
-            **bill_details
+            **bill_details,
+            "success": True,
+            "message": "Bill details retrieved successfully"
         }
         
         logger.info(f"Bill details retrieved successfully for meter ID: {meter_id}")
-        return response
+        return ORJSONResponse(response, headers=cache_headers())
         
     except FileNotFoundError as e:
         logger.error(f"Archive file not found: {str(e)}")
@@ -452,16 +462,10 @@ async def restore_data():
             
         logger.info("Starting data restoration process")
         restorer = DataRestorer()
-        restored_data = restorer.restore_data()
+        restored_data = await run_in_threadpool(restorer.restore_data)
         
         # Update system data
-        total_readings = 0
-        restored_meters = 0
-        for meter_id, readings in restored_data.items():
-            if meter_id in api_system.accounts:
-                api_system.accounts[meter_id].meter_readings.update(readings)
-                restored_meters += 1
-                total_readings += len(readings)
+        restored_meters, total_readings = await run_in_threadpool(api_system.restore_readings, restored_data)
         
         logger.info(f"Successfully restored {restored_meters} meters and {total_readings} readings")
         return RestoreResponse(
@@ -479,7 +483,16 @@ async def restore_data():
         )
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="localhost", port=8000)
+    # Accounts and readings live in process memory, so keep one worker unless
+    # EMS_WORKERS is raised explicitly; uvloop/httptools are used when installed
+    uvicorn.run(
+        "app:app",
+        host=os.getenv("EMS_HOST", "localhost"),
+        port=int(os.getenv("EMS_PORT", "8000")),
+        workers=int(os.getenv("EMS_WORKERS", "1")),
+        loop="auto",
+        http="auto"
+    )
 
 # After server starts, you can access API documentation at:
 # Swagger UI: http://localhost:8000/docs
@@ -9,11 +9,13 @@ Implementation:
 from datetime import datetime, timedelta
 import os
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import requests
 import asyncio
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from loggers import logger
+from APIs import to_epoch
 import csv
 
 class MaintenanceResponse(BaseModel):
@@ -23,7 +25,7 @@ class MaintenanceResponse(BaseModel):
     archive_path: Optional[str] = None
 
 # Create maintenance server application
-maintenance_app = FastAPI(title="Power Consumption Management System Maintenance Service")
+maintenance_app = FastAPI(title="Power Consumption Management System Maintenance Service", default_response_class=ORJSONResponse)
 
 class DailyMaintenance:
     """
@@ -38,21 +40,21 @@ class DailyMaintenance:
         self.archive_dir = os.path.join("Archive")
         os.makedirs(self.archive_dir, exist_ok=True)
     
-    def _get_yesterday_readings(self, meter_readings: Dict[datetime, float]) -> Dict[datetime, float]:
+    def _get_yesterday_range(self, account) -> Tuple[int, int]:
         """
-        Get yesterday's readings from meter readings
+        Get index range of yesterday's readings in an account
         
         Parameters:
-        - meter_readings: Dictionary of timestamp-reading pairs
+        - account: Meter account
         
         Returns:
-        - Dictionary of timestamp-reading pairs for yesterday
+        - Tuple of (lo, hi) indices of yesterday's readings
         """
         yesterday = (datetime.now() - timedelta(days=1)).date()
         day_start = datetime.combine(yesterday, datetime.min.time())
         day_end = day_start + timedelta(days=1)
         
-        return {ts: reading for ts, reading in meter_readings.items() if day_start <= ts < day_end}
+        return account.find_range(to_epoch(day_start), to_epoch(day_end))
     
     def perform_maintenance(self, accounts: Dict[str, object]) -> bool:
         """
@@ -73,24 +75,22 @@ class DailyMaintenance:
             all_readings = []
             for meter_id, account in accounts.items():
                 # Get yesterday's readings
-                yesterday_readings = self._get_yesterday_readings(account.meter_readings)
+                lo, hi = self._get_yesterday_range(account)
                 
                 # Add to collection
-                for ts, reading in yesterday_readings.items():
-                    all_readings.append({
-                        "meter_id": meter_id,
-                        "timestamp": ts.isoformat(),
-                        "reading": reading
-                    })
-                    
-                    # Clear from memory
-                    del account.meter_readings[ts]
+                all_readings.extend(
+                    (meter_id, ts.isoformat(), reading) for ts, reading in account.iter_readings(lo, hi)
+                )
+                
+                # Clear from memory
+                account.remove_range(lo, hi)
             
             # Save to CSV if we have readings
             if all_readings:
-                with open(archive_file, "w", newline="") as f:
-                    writer = csv.DictWriter(f, fieldnames=["meter_id", "timestamp", "reading"])
-                    writer.writeheader()
+                # Rows are plain tuples written through a 1 MiB buffer
+                with open(archive_file, "w", newline="", buffering=1 << 20) as f:
+                    writer = csv.writer(f)
+                    writer.writerow(("meter_id", "timestamp", "reading"))
                     writer.writerows(all_readings)
                 
                 logger.info(f"Successfully archived {len(all_readings)} readings to {archive_file}")
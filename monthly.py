@@ -11,12 +11,14 @@ Functions:
 
 from datetime import datetime, timedelta
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import requests
 import os
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 import csv
 from loggers import logger
+from APIs import to_epoch
 
 class MaintenanceResponse(BaseModel):
     success: bool
@@ -25,7 +27,7 @@ class MaintenanceResponse(BaseModel):
     archive_path: Optional[str] = None
 
 # Create maintenance server application
-maintenance_app = FastAPI(title="Power Consumption Monthly Billing Service")
+maintenance_app = FastAPI(title="Power Consumption Monthly Billing Service", default_response_class=ORJSONResponse)
 
 class MonthlyMaintenance:
     """
@@ -40,22 +42,22 @@ class MonthlyMaintenance:
         self.archive_dir = os.path.join("Archive")
         os.makedirs(self.archive_dir, exist_ok=True)
     
-    def _get_last_month_readings(self, meter_readings: Dict[datetime, float]) -> Dict[datetime, float]:
+    def _get_last_month_range(self, account) -> Tuple[int, int]:
         """
-        Get last month's readings from meter readings
+        Get index range of last month's readings in an account
         
         Parameters:
-        - meter_readings: Dictionary of timestamp-reading pairs
+        - account: Meter account
         
         Returns:
-        - Dictionary of timestamp-reading pairs for last month
+        - Tuple of (lo, hi) indices of last month's readings
         """
         now = datetime.now()
         first_day_this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         last_month = first_day_this_month - timedelta(days=1)
         month_start = last_month.replace(day=1)
         
-        return {ts: reading for ts, reading in meter_readings.items() if month_start <= ts < first_day_this_month}
+        return account.find_range(to_epoch(month_start), to_epoch(first_day_this_month))
     
     def perform_maintenance(self, accounts: Dict[str, object]) -> bool:
         """
@@ -83,24 +85,22 @@ class MonthlyMaintenance:
             all_readings = []
             for meter_id, account in accounts.items():
                 # Get last month's readings
-                last_month_readings = self._get_last_month_readings(account.meter_readings)
+                lo, hi = self._get_last_month_range(account)
                 
                 # Add to collection
-                for ts, reading in last_month_readings.items():
-                    all_readings.append({
-                        "meter_id": meter_id,
-                        "timestamp": ts.isoformat(),
-                        "reading": reading
-                    })
-                    
-                    # Clear from memory
-                    del account.meter_readings[ts]
+                all_readings.extend(
+                    (meter_id, ts.isoformat(), reading) for ts, reading in account.iter_readings(lo, hi)
+                )
+                
+                # Clear from memory
+                account.remove_range(lo, hi)
             
             # Save to CSV if we have readings
             if all_readings:
-                with open(archive_file, "w", newline="") as f:
-                    writer = csv.DictWriter(f, fieldnames=["meter_id", "timestamp", "reading"])
-                    writer.writeheader()
+                # Rows are plain tuples written through a 1 MiB buffer
+                with open(archive_file, "w", newline="", buffering=1 << 20) as f:
+                    writer = csv.writer(f)
+                    writer.writerow(("meter_id", "timestamp", "reading"))
                     writer.writerows(all_readings)
                 
                 logger.info(f"Successfully archived {len(all_readings)} readings to {archive_file}")
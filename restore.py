@@ -8,11 +8,18 @@ Functionality:
 """
 
 import os
-import csv
 import re
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 from loggers import logger
+from APIs import ARCHIVE_COLUMN_TYPES
+
+# Log line written for each recorded meter reading
+LOG_LINE_PATTERN = re.compile(
+    r"INFO - (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - Meter reading recorded successfully: ([\w-]+), (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}), ([\d.]+)"
+)
 
 class DataRestorer:
     """
@@ -29,7 +36,7 @@ class DataRestorer:
         
     def _get_daily_files_for_current_month(self) -> List[str]:
         """
-        Get all daily CSV files for current month from Archive directory
+        Get all daily CSV and Parquet files for current month from Archive directory
         
         Returns:
         - List of file paths
@@ -41,10 +48,11 @@ class DataRestorer:
         # Get all daily files in Archive directory
         daily_files = []
         for file in os.listdir(self.archive_dir):
-            if file.startswith("daily_") and file.endswith(".csv"):
+            name, extension = os.path.splitext(file)
+            if name.startswith("daily_") and extension in (".csv", ".parquet"):
                 # Extract date from filename
                 try:
-                    date_str = file[6:-4]  # Remove 'daily_' prefix and '.csv' suffix
+                    date_str = name[6:]  # Remove 'daily_' prefix
                     file_date = datetime.strptime(date_str, "%Y-%m-%d").date()
                     # Check if file is from current month
                     if file_date.year == year and file_date.month == month:
@@ -54,6 +62,20 @@ class DataRestorer:
         
         return sorted(daily_files)  # Sort files by date
     
+    def _iter_archive_rows(self, file: str) -> Iterator[Tuple[str, datetime, float]]:
+        """
+        Iterate (meter_id, timestamp, reading) rows of a CSV or Parquet archive file
+        """
+        if file.endswith(".parquet"):
+            table = pq.read_table(file, columns=list(ARCHIVE_COLUMN_TYPES))
+        else:
+            # Arrow parses whole timestamp and reading columns at once instead of row by row
+            table = pacsv.read_csv(file, convert_options=pacsv.ConvertOptions(
+                column_types=ARCHIVE_COLUMN_TYPES,
+                include_columns=list(ARCHIVE_COLUMN_TYPES)
+            ))
+        yield from zip(*(table.column(name).to_pylist() for name in ARCHIVE_COLUMN_TYPES))
+    
     def _parse_log_line(self, line: str) -> Tuple[str, datetime, float]:
         """
         Parse log line to extract meter reading record
@@ -68,20 +90,17 @@ class DataRestorer:
         INFO - 2025-02-14 12:38:43,081 - Meter reading recorded successfully: 999-999-999, 2025-01-08 01:00:00, 100.5
         """
         try:
-            # More strict regex pattern
-            pattern = r"INFO - (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - Meter reading recorded successfully: ([\w-]+), (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}), ([\d.]+)"
-            match = re.search(pattern, line)
+            match = LOG_LINE_PATTERN.search(line)
             if not match:
                 return None
             
-            # Extract components
-            log_timestamp = datetime.strptime(match.group(1).split(',')[0], "%Y-%m-%d %H:%M:%S")
+            # Extract components; the pattern already fixes the timestamp layout
             meter_id = match.group(2)
-            reading_timestamp = datetime.strptime(match.group(3), "%Y-%m-%d %H:%M:%S")
+            reading_timestamp = datetime.fromisoformat(match.group(3))
             reading = float(match.group(4))
             
             # Validate reading timestamp
-            if reading_timestamp.minute not in [0, 30] or reading_timestamp.second != 0:
+            if reading_timestamp.minute % 30 or reading_timestamp.second:
                 logger.warning(f"Invalid reading timestamp format in log: {reading_timestamp}")
                 return None
             
@@ -105,7 +124,7 @@ class DataRestorer:
         """
         try:
             # Check timestamp format
-            if timestamp.minute not in [0, 30] or timestamp.second != 0:
+            if timestamp.minute % 30 or timestamp.second:
                 logger.warning(f"Invalid timestamp format: {timestamp}")
                 return False
             
@@ -169,18 +188,12 @@ class DataRestorer:
         restored_from_csv = 0
         for file in daily_files:
             try:
-                with open(file, "r") as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        meter_id = row["meter_id"]
-                        timestamp = datetime.fromisoformat(row["timestamp"])
-                        reading = float(row["reading"])
-                        
-                        if self._validate_reading(meter_id, timestamp, reading, restored_data):
-                            if meter_id not in restored_data:
-                                restored_data[meter_id] = {}
-                            restored_data[meter_id][timestamp] = reading
-                            restored_from_csv += 1
+                for meter_id, timestamp, reading in self._iter_archive_rows(file):
+                    if self._validate_reading(meter_id, timestamp, reading, restored_data):
+                        if meter_id not in restored_data:
+                            restored_data[meter_id] = {}
+                        restored_data[meter_id][timestamp] = reading
+                        restored_from_csv += 1
             except Exception as e:
                 logger.error(f"Error processing CSV file {file}: {str(e)}")
                 continue
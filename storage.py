@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Reading storage module
+
+Functionality:
+1. Persist live (not yet archived) meter readings in SQLite
+2. Reload them on startup so readings survive a restart
+"""
+
+import sqlite3
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, Tuple
+from loggers import logger
+
+# Rows deleted per transaction, so other writers get the store lock between batches
+DELETE_BATCH_ROWS = 10000
+
+class ReadingStore:
+    """
+    SQLite store for live meter readings
+
+    Readings are keyed by (meter_id, ts), with ts in epoch seconds. The table is
+    clustered on that key, so lookups and deletes of single readings are index seeks.
+
+    Attributes:
+    - db_path: SQLite database file path
+    """
+
+    def __init__(self, db_path: str = "readings.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS readings ("
+            "meter_id TEXT NOT NULL, "
+            "ts INTEGER NOT NULL, "
+            "reading REAL NOT NULL, "
+            "PRIMARY KEY (meter_id, ts)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def add_reading(self, meter_id: str, ts: int, reading: float):
+        """
+        Insert or overwrite a single reading
+
+        Parameters:
+        - meter_id: Meter ID
+        - ts: Reading timestamp in epoch seconds
+        - reading: Reading value
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO readings (meter_id, ts, reading) VALUES (?, ?, ?)",
+                (meter_id, ts, reading)
+            )
+
+    def add_readings(self, rows: Iterable[Tuple[str, int, float]]):
+        """
+        Insert or overwrite many readings in one transaction
+
+        Parameters:
+        - rows: Iterable of (meter_id, ts, reading) tuples
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO readings (meter_id, ts, reading) VALUES (?, ?, ?)",
+                rows
+            )
+
+    def delete_readings(self, rows: Iterable[Tuple[str, int, float]]):
+        """
+        Delete exactly the given readings
+
+        A row is only deleted if its stored reading still matches, so a reading
+        overwritten since the rows were collected is kept.
+
+        Parameters:
+        - rows: Iterable of (meter_id, ts, reading) tuples
+        """
+        rows = iter(rows)
+        deleted = 0
+        while True:
+            batch = list(islice(rows, DELETE_BATCH_ROWS))
+            if not batch:
+                break
+            with self._lock, self._conn:
+                cursor = self._conn.executemany(
+                    "DELETE FROM readings WHERE meter_id = ? AND ts = ? AND reading = ?",
+                    batch
+                )
+            deleted += cursor.rowcount
+        logger.info(f"Deleted {deleted} readings from {self.db_path}")
+
+    def iter_readings(self) -> Iterator[Tuple[str, int, float]]:
+        """
+        Iterate all stored readings ordered by meter ID and timestamp
+
+        Returns:
+        - Iterator of (meter_id, ts, reading) tuples
+
+        Rows are streamed from the cursor, and the store stays locked until iteration finishes.
+        """
+        with self._lock:
+            yield from self._conn.execute("SELECT meter_id, ts, reading FROM readings ORDER BY meter_id, ts")